@@ -1,17 +1,33 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import Response, StreamingResponse
 from typing import List, Optional, Dict, Any
 from pydantic import BaseModel
 import os
-from openai import OpenAI
-import json
-from datetime import datetime
+import sys
+from openai import APIConnectionError, AsyncOpenAI, InternalServerError, RateLimitError
+from tenacity import AsyncRetrying, retry_if_exception_type, stop_after_attempt, wait_exponential
+import httpx
+import orjson
+import fastjsonschema
+import string
+from dataclasses import dataclass, fields
 from dotenv import load_dotenv
-import smtplib
+import aiosmtplib
+import asyncio
+import time
+import hashlib
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from operator import attrgetter
 from email.mime.text import MIMEText
 
 load_dotenv()
 
+# Role strings shared by the message dicts we build (user messages reuse the request's strings)
+ROLE_ASSISTANT, ROLE_TOOL, ROLE_SYSTEM = map(sys.intern, ("assistant", "tool", "system"))
+
 class Message(BaseModel):
     """Represents a single message in the conversation."""
     role: str # 'user', 'assistant', or 'system'
@@ -27,39 +43,102 @@ class ChatResponse(BaseModel):
     message: Message
     session_id: str
 
-def submit_contact_request(name: str, email: str, message: str) -> Dict[str, str]:
+@dataclass(frozen=True, slots=True)
+class SmtpConfig:
+    """Gmail credentials and recipient for contact request emails."""
+    my_email: Optional[str]
+    my_password: Optional[str]
+    other_email: Optional[str]
+
+    def missing(self) -> List[str]:
+        """Returns the names of any settings that weren't provided."""
+        return [field.name for field in fields(self) if not getattr(self, field.name)]
+
+# Read once at import instead of on every contact request
+SMTP_CONFIG = SmtpConfig(
+    my_email=os.getenv("MY_EMAIL"),
+    my_password=os.getenv("MY_PASSWORD"),
+    other_email=os.getenv("OTHER_EMAIL"),
+)
+
+# Persistent SMTP connection shared across contact requests
+_smtp_client: Optional[aiosmtplib.SMTP] = None
+_smtp_lock = asyncio.Lock()
+_smtp_last_success_ts = 0.0
+SMTP_IDLE_CHECK_SECONDS = 120
+
+CONTACT_EMAIL_TEMPLATE = string.Template(
+    "You received a new contact request:\n"
+    "\n"
+    "Name: $name\n"
+    "Email: $email\n"
+    "Message:\n"
+    "$message\n"
+    "\n"
+    "Sent at: $sent_at\n"
+)
+
+async def _get_smtp_client() -> aiosmtplib.SMTP:
+    """
+    Returns a connected, logged-in SMTP client, reconnecting if the connection went stale.
+    Must be called while holding _smtp_lock.
+    """
+    global _smtp_client
+
+    if _smtp_client is not None and _smtp_client.is_connected:
+        if time.monotonic() - _smtp_last_success_ts < SMTP_IDLE_CHECK_SECONDS:
+            return _smtp_client
+        # Idle for a while, make sure the server hasn't dropped us
+        try:
+            await _smtp_client.noop(timeout=5)
+            return _smtp_client
+        except Exception:
+            _smtp_client.close()
+
+    _smtp_client = None
+    smtp = aiosmtplib.SMTP(hostname="smtp.gmail.com", port=587, start_tls=True)
+    await smtp.connect()
+    try:
+        await smtp.login(SMTP_CONFIG.my_email, SMTP_CONFIG.my_password)
+    except Exception:
+        smtp.close()
+        raise
+    _smtp_client = smtp
+    return smtp
+
+async def submit_contact_request(name: str, email: str, message: str) -> Dict[str, str]:
     """
     Submits a contact request with user's name, email, and message.
     Sends an email notification using Gmail SMTP.
     """
-    MY_EMAIL = os.getenv("MY_EMAIL")
-    MY_PASSWORD = os.getenv("MY_PASSWORD")
-    OTHER_EMAIL = os.getenv("OTHER_EMAIL")
+    global _smtp_client, _smtp_last_success_ts
 
     # Compose email
     subject = f"New Contact Request from {name}"
-    body = f"""
-    You received a new contact request:
-
-    Name: {name}
-    Email: {email}
-    Message:
-    {message}
-
-    Sent at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-    """
+    body = CONTACT_EMAIL_TEMPLATE.substitute(
+        name=name,
+        email=email,
+        message=message,
+        sent_at=time.strftime('%Y-%m-%d %H:%M:%S'),
+    )
 
     msg = MIMEText(body)
     msg["Subject"] = subject
-    msg["From"] = MY_EMAIL
-    msg["To"] = OTHER_EMAIL
+    msg["From"] = SMTP_CONFIG.my_email
+    msg["To"] = SMTP_CONFIG.other_email
 
-    # Send email securely
+    # Send email securely over the shared connection
     try:
-        with smtplib.SMTP("smtp.gmail.com", 587) as server:
-            server.starttls()
-            server.login(MY_EMAIL, MY_PASSWORD)
-            server.send_message(msg)
+        async with _smtp_lock:
+            smtp = await _get_smtp_client()
+            try:
+                await smtp.send_message(msg)
+            except Exception:
+                # Drop the connection so the next request starts fresh
+                smtp.close()
+                _smtp_client = None
+                raise
+            _smtp_last_success_ts = time.monotonic()
             print("✅ Email sent successfully.")
     except Exception as e:
         print(f"❌ Failed to send email: {e}")
@@ -75,24 +154,90 @@ def get_project_details(project_name: str) -> Dict[str, Any]:
     Retrieves detailed information about a specific project from the resume data.
     """
     project_name = project_name.lower()
-    
-    # Check personal projects
-    for project in Resume_Info.get("personal_projects", []):
-        if project_name in project["title"].lower():
-            return project
-    
-    # Check work experience
-    for job in Resume_Info.get("work_experience", []):
-        if project_name in job["company"].lower() or project_name in job["title"].lower():
-            return job
+
+    # Exact title/company match
+    if project_name in _PROJECT_INDEX:
+        return _PROJECT_INDEX[project_name]
+
+    # Partial match, personal projects first then work experience
+    for key, item in _PROJECT_KEYS:
+        if project_name in key:
+            return item
 
     return {"status": "not_found", "message": f"Could not find detailed information for a project named '{project_name}'. Please try another name."}
 
-# Map tool names to actual functions
-available_functions = {
-    "submit_contact_request": submit_contact_request,
-    "get_project_details": get_project_details,
-}
+# Tools with side effects; these run one at a time in the order the model emitted them
+WRITE_TOOLS = {"submit_contact_request"}
+
+def _invalid_args(function_name: str, validate, function_args: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """Returns an error result if the arguments don't match the tool's schema."""
+    try:
+        validate(function_args)
+    except fastjsonschema.JsonSchemaValueException as e:
+        return {"status": "error", "message": f"Invalid arguments for {function_name}: {e.message}"}
+    return None
+
+async def invoke_tool(tool_call) -> Any:
+    """
+    Parses and validates a tool call's arguments and runs the matching function.
+    """
+    function_name = tool_call.function.name
+    try:
+        function_args = orjson.loads(tool_call.function.arguments)
+    except orjson.JSONDecodeError:
+        function_args = {}
+
+    # Direct dispatch for the handful of tools we have; switch back to a lookup table if this grows
+    match function_name:
+        case "submit_contact_request":
+            error = _invalid_args(function_name, validate_contact_args, function_args)
+            if error:
+                return error
+            return await submit_contact_request(function_args["name"], function_args["email"], function_args["message"])
+        case "get_project_details":
+            error = _invalid_args(function_name, validate_project_args, function_args)
+            if error:
+                return error
+            return get_project_details(function_args["project_name"])
+        case _:
+            return {"status": "error", "message": f"Unknown tool '{function_name}'."}
+
+async def _invoke_tools_in_order(tool_calls) -> List[Any]:
+    """Runs tool calls one after another, capturing exceptions as results."""
+    results = []
+    for tool_call in tool_calls:
+        try:
+            results.append(await invoke_tool(tool_call))
+        except Exception as e:
+            results.append(e)
+    return results
+
+async def run_tool_calls(tool_calls) -> List[Any]:
+    """
+    Runs all tool calls from one assistant turn concurrently.
+    Read-only tools run in parallel; write tools run sequentially in emitted order.
+    Results are returned in the original tool_calls order.
+    """
+    read_indices = [i for i, tc in enumerate(tool_calls) if tc.function.name not in WRITE_TOOLS]
+    write_indices = [i for i, tc in enumerate(tool_calls) if tc.function.name in WRITE_TOOLS]
+
+    *read_results, write_results = await asyncio.gather(
+        *(invoke_tool(tool_calls[i]) for i in read_indices),
+        _invoke_tools_in_order([tool_calls[i] for i in write_indices]),
+        return_exceptions=True,
+    )
+
+    results: List[Any] = [None] * len(tool_calls)
+    for i, result in zip(read_indices, read_results):
+        results[i] = result
+    for i, result in zip(write_indices, write_results):
+        results[i] = result
+
+    for i, result in enumerate(results):
+        if isinstance(result, Exception):
+            print(f"❌ Tool '{tool_calls[i].function.name}' failed: {result}")
+            results[i] = {"status": "error", "message": "The tool failed to run. Please try again later."}
+    return results
 
 tools = [
     {
@@ -127,9 +272,63 @@ tools = [
     }
 ]
 
+# Compiled argument validators, one per tool
+_tool_parameters = {tool["function"]["name"]: tool["function"]["parameters"] for tool in tools}
+validate_contact_args = fastjsonschema.compile(_tool_parameters["submit_contact_request"])
+validate_project_args = fastjsonschema.compile(_tool_parameters["get_project_details"])
+
 frontend_url = os.getenv("FRONTEND_URL")
 
-app = FastAPI(title="Portfolio AI Agent")
+# Server-sent event routes; gzip would buffer them and delay every event
+UNCOMPRESSED_PATHS = {"/api/chat/stream"}
+
+class StreamSafeGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves streaming routes uncompressed, regardless of Starlette version."""
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] in UNCOMPRESSED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# DeepSeek client, created at startup on top of the shared HTTP pool
+client: Optional[AsyncOpenAI] = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Checks configuration and creates the shared outbound HTTP client so all calls reuse TCP+TLS connections.
+    On shutdown, closes the HTTP client and the persistent SMTP connection.
+    """
+    global client
+    missing_smtp = SMTP_CONFIG.missing()
+    if missing_smtp:
+        raise RuntimeError(f"Missing SMTP settings: {', '.join(name.upper() for name in missing_smtp)}")
+
+    app.state.http = httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=128, keepalive_expiry=30),
+        http2=True,
+        timeout=httpx.Timeout(30.0, connect=5.0),
+    )
+    client = AsyncOpenAI(
+        api_key=os.getenv("DEEPSEEK_API_KEY"),
+        base_url="https://api.deepseek.com",
+        # Retries are handled by llm_retrying so failed calls aren't retried at two layers
+        max_retries=0,
+        http_client=app.state.http,
+    )
+
+    yield
+
+    await app.state.http.aclose()
+    if _smtp_client is not None and _smtp_client.is_connected:
+        try:
+            await _smtp_client.quit(timeout=5)
+        except Exception:
+            # Server already dropped us, just release the socket
+            _smtp_client.close()
+
+app = FastAPI(title="Portfolio AI Agent", lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -139,20 +338,89 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Session-Id"],
 )
-
-client = OpenAI(
-    api_key=os.getenv("DEEPSEEK_API_KEY"),
-    base_url="https://api.deepseek.com"
-)
+app.add_middleware(StreamSafeGZipMiddleware, minimum_size=512)
+
+# Total cap on in-flight DeepSeek calls, shared by all worker processes
+LLM_CONCURRENCY_TOTAL = int(os.getenv("LLM_CONCURRENCY", "8"))
+
+# Number of worker processes sharing that cap. Only known when WEB_CONCURRENCY is set,
+# either explicitly or by the __main__ launcher below; otherwise assume a single process
+WORKER_COUNT = int(os.getenv("WEB_CONCURRENCY", "1"))
+
+if WORKER_COUNT > LLM_CONCURRENCY_TOTAL:
+    print(f"⚠️ WEB_CONCURRENCY={WORKER_COUNT} exceeds LLM_CONCURRENCY={LLM_CONCURRENCY_TOTAL}; "
+          f"each worker keeps 1 slot, so up to {WORKER_COUNT} DeepSeek calls can be in flight")
+
+LLM_CONCURRENCY = asyncio.Semaphore(max(1, LLM_CONCURRENCY_TOTAL // WORKER_COUNT))
+
+@asynccontextmanager
+async def llm_slot():
+    """Holds one upstream LLM concurrency slot, logging how long we waited for it."""
+    wait_start = time.monotonic()
+    async with LLM_CONCURRENCY:
+        wait_ms = (time.monotonic() - wait_start) * 1000
+        if wait_ms >= 1:
+            print(f"⏳ Waited {wait_ms:.0f} ms for an LLM slot")
+        yield
+
+def llm_retrying() -> AsyncRetrying:
+    """Retry policy for DeepSeek calls: exponential backoff on rate limits and transient failures."""
+    return AsyncRetrying(
+        retry=retry_if_exception_type((RateLimitError, APIConnectionError, InternalServerError)),
+        wait=wait_exponential(multiplier=0.5, max=8),
+        stop=stop_after_attempt(3),
+        reraise=True,
+    )
+
+async def create_completion(**kwargs):
+    """Calls DeepSeek under the concurrency limit. The slot is released while backing off between attempts."""
+    async for attempt in llm_retrying():
+        with attempt:
+            async with llm_slot():
+                return await client.chat.completions.create(**kwargs)
 
 try:
-    with open('resume_info.json', 'r') as file:
-        Resume_Info = json.load(file)
+    with open('resume_info.json', 'rb') as file:
+        Resume_Info = orjson.loads(file.read())
 except FileNotFoundError:
     print("Error: 'resume_info.json' not found. Please create it using the content below.")
     Resume_Info = {} 
 
+# Lowercased lookup keys for get_project_details, built once at load time
+_PROJECT_KEYS = [(project["title"].lower(), project) for project in Resume_Info.get("personal_projects", [])]
+for job in Resume_Info.get("work_experience", []):
+    _PROJECT_KEYS.append((job["company"].lower(), job))
+    _PROJECT_KEYS.append((job["title"].lower(), job))
+
+_PROJECT_INDEX: Dict[str, Dict[str, Any]] = {}
+for key, item in _PROJECT_KEYS:
+    _PROJECT_INDEX.setdefault(key, item)
+
+SUMMARY_SNIPPET_CHARS = 120
+
+def _summarize_item(item: Dict[str, Any], keys: List[str]) -> Dict[str, Any]:
+    """Keeps the identifying fields of a project or job plus a one-line snippet of its description."""
+    summary = {key: item[key] for key in keys if key in item}
+    bullet_points = item.get("bullet_points") or []
+    if bullet_points:
+        summary["summary"] = bullet_points[0][:SUMMARY_SNIPPET_CHARS]
+    return summary
+
+# Trimmed resume for the system prompt; full records are served by get_project_details
+Resume_Info_Summary = {
+    **Resume_Info,
+    "work_experience": [
+        _summarize_item(job, ["company", "title", "dates", "technologies"])
+        for job in Resume_Info.get("work_experience", [])
+    ],
+    "personal_projects": [
+        _summarize_item(project, ["title", "dates", "technologies"])
+        for project in Resume_Info.get("personal_projects", [])
+    ],
+}
+
 arian_info = """
 Hey, this is Arian. I love the gym, music, sports, and a good show to unwind.
 I stick to a push pull legs routine, and when I’m not lifting, I’m probably listening to The Weeknd.
@@ -169,8 +437,8 @@ PORTFOLIO_INFO = f"""
 Arian Khan is an Engineering student passionate about building intelligent systems that bridge human and machine interaction. 
 He combines expertise in deep learning, full-stack development, and embedded systems to create practical, end-to-end AI applications.
 
-His resume is as follows:
-{json.dumps(Resume_Info)}
+His resume is as follows (use get_project_details for the full description of any project or job):
+{orjson.dumps(Resume_Info_Summary).decode()}
 
 Here's some info on Arian:
 {arian_info}
@@ -201,46 +469,103 @@ Guidelines:
 - Be short and concise like 1-2 sentences or roughly 40–60 words unless detail is explicitly requested
 
 """
+
+# Built once and shared by every request; the SDK only reads it
+SYSTEM_MSG = {"role": ROLE_SYSTEM, "content": SYSTEM_PROMPT}
+_role_and_content = attrgetter("role", "content")
+
+# LRU cache of final assistant replies keyed by the exact conversation
+# Each Uvicorn worker process keeps its own copy
+RESPONSE_CACHE_SIZE = 512
+_response_cache: "OrderedDict[bytes, str]" = OrderedDict()
+
+def _response_cache_key(messages: List[Dict[str, Any]]) -> bytes:
+    """Hashes a conversation into a compact cache key."""
+    return hashlib.blake2b(orjson.dumps(messages, option=orjson.OPT_SORT_KEYS)).digest()
+
+def _response_cache_get(key: bytes) -> Optional[str]:
+    """Returns a cached reply and marks it as recently used."""
+    content = _response_cache.get(key)
+    if content is not None:
+        _response_cache.move_to_end(key)
+    return content
+
+def _response_cache_put(key: bytes, content: str) -> None:
+    """Stores a reply, evicting the least recently used entry when full."""
+    _response_cache[key] = content
+    _response_cache.move_to_end(key)
+    if len(_response_cache) > RESPONSE_CACHE_SIZE:
+        _response_cache.popitem(last=False)
+
+def prepare_chat(request: ChatRequest):
+    """
+    Builds the upstream message list for a chat request.
+    Returns the messages, the session id to echo back, and the response cache key.
+    """
+    messages = [SYSTEM_MSG, *({"role": role, "content": content} for role, content in map(_role_and_content, request.messages))]
+    session_id = request.session_id if request.session_id else "default"
+
+    # The system prompt is constant per process, so only the visitor's conversation is hashed
+    cache_key = _response_cache_key(messages[1:])
+    return messages, session_id, cache_key
+
+async def run_tool_turn(messages: List[Any]):
+    """
+    Sends the conversation with tools enabled and runs any tools the model asks for.
+    Tool results are appended to messages, so a follow-up completion is needed when tools were called.
+    Returns the assistant message and whether the turn is safe to cache.
+    """
+    response = await create_completion(
+        model="deepseek-chat",
+        messages=messages,
+        tools=tools,
+        tool_choice="auto",
+        temperature=0.7,
+        max_tokens=500
+    )
+    
+    assistant_message = response.choices[0].message
+    cacheable = True
+    
+    if assistant_message.tool_calls:
+        # Never replay turns that had side effects
+        cacheable = not any(tc.function.name in WRITE_TOOLS for tc in assistant_message.tool_calls)
+
+        # Plain dict so the SDK doesn't have to dump the model again on the follow-up call
+        messages.append({
+            "role": ROLE_ASSISTANT,
+            "content": assistant_message.content,
+            "tool_calls": [tool_call.model_dump(exclude_none=True) for tool_call in assistant_message.tool_calls]
+        })
+
+        tool_results = await run_tool_calls(assistant_message.tool_calls)
+
+        for tool_call, function_response in zip(assistant_message.tool_calls, tool_results):
+            messages.append({
+                "role": ROLE_TOOL,
+                "tool_call_id": tool_call.id,
+                "name": tool_call.function.name,
+                "content": orjson.dumps(function_response).decode()
+            })
+
+    return assistant_message, cacheable
+
 @app.post("/api/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """Main chat endpoint"""
     try:
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-
-        for msg in request.messages:
-            messages.append({"role": msg.role, "content": msg.content})
-        
-        response = client.chat.completions.create(
-            model="deepseek-chat",
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-            temperature=0.7,
-            max_tokens=500
-        )
+        messages, session_id_to_return, cache_key = prepare_chat(request)
+        cached_content = _response_cache_get(cache_key)
+        if cached_content is not None:
+            return ChatResponse(
+                message=Message(role=ROLE_ASSISTANT, content=cached_content),
+                session_id=session_id_to_return
+            )
         
-        assistant_message = response.choices[0].message
+        assistant_message, cacheable = await run_tool_turn(messages)
         
         if assistant_message.tool_calls:
-            messages.append(assistant_message)
-
-            for tool_call in assistant_message.tool_calls:
-                function_name = tool_call.function.name
-                try:
-                    function_args = json.loads(tool_call.function.arguments)
-                except json.JSONDecodeError:
-                    function_args = {}
-                
-                function_response = available_functions[function_name](**function_args)
-                
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "name": function_name,
-                    "content": json.dumps(function_response)
-                })
-            
-            final_response = client.chat.completions.create(
+            final_response = await create_completion(
                 model="deepseek-chat",
                 messages=messages,
                 temperature=0.7,
@@ -249,11 +574,12 @@ async def chat(request: ChatRequest):
             
             assistant_message = final_response.choices[0].message
         
-        session_id_to_return = request.session_id if request.session_id else "default"
+        if cacheable and assistant_message.content:
+            _response_cache_put(cache_key, assistant_message.content)
         
         return ChatResponse(
             message=Message(
-                role="assistant",
+                role=ROLE_ASSISTANT,
                 content=assistant_message.content
             ),
             session_id=session_id_to_return
@@ -263,23 +589,127 @@ async def chat(request: ChatRequest):
         print(f"Error: {str(e)}")
         raise HTTPException(status_code=500, detail="An internal server error occurred. Please check the backend logs.")
 
+SSE_DONE = b"data: [DONE]\n\n"
+
+async def _pump_completion_stream(queue: asyncio.Queue, **kwargs) -> None:
+    """
+    Reads a streamed completion into a queue at upstream speed, followed by None.
+    The LLM slot is released once DeepSeek is done, not when a slow client finishes reading.
+    """
+    try:
+        async for attempt in llm_retrying():
+            async with llm_slot():
+                # Only opening the stream is retried; once deltas are queued a retry would repeat them
+                with attempt:
+                    stream = await client.chat.completions.create(stream=True, **kwargs)
+                if attempt.retry_state.outcome.failed:
+                    continue
+
+                async with stream:
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        delta = chunk.choices[0].delta.content
+                        if delta:
+                            queue.put_nowait(delta)
+                return
+    finally:
+        queue.put_nowait(None)
+
+def _sse(payload: Dict[str, Any]) -> bytes:
+    """Encodes a payload as a single server-sent event."""
+    return b"data: " + orjson.dumps(payload) + b"\n\n"
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """Streaming chat endpoint, sends the reply as server-sent events"""
+    messages, session_id_to_return, cache_key = prepare_chat(request)
+
+    async def event_stream():
+        try:
+            cached_content = _response_cache_get(cache_key)
+            if cached_content is not None:
+                yield _sse({"content": cached_content})
+                yield SSE_DONE
+                return
+
+            # The first call stays non-streaming since tools need the full tool_calls list
+            assistant_message, cacheable = await run_tool_turn(messages)
+
+            if not assistant_message.tool_calls:
+                content = assistant_message.content or ""
+                yield _sse({"content": content})
+            else:
+                parts = []
+                queue: asyncio.Queue = asyncio.Queue()
+                pump = asyncio.create_task(_pump_completion_stream(
+                    queue,
+                    model="deepseek-chat",
+                    messages=messages,
+                    temperature=0.7,
+                    max_tokens=500
+                ))
+                try:
+                    while (delta := await queue.get()) is not None:
+                        parts.append(delta)
+                        yield _sse({"content": delta})
+                    # Surface any upstream error
+                    await pump
+                finally:
+                    # Client went away or we failed; stop reading upstream
+                    pump.cancel()
+                content = "".join(parts)
+
+            if cacheable and content:
+                _response_cache_put(cache_key, content)
+            yield SSE_DONE
+
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            yield _sse({"error": "An internal server error occurred. Please check the backend logs."})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"X-Session-Id": session_id_to_return}
+    )
+
+
+# Constant bodies, encoded once. A fresh Response wraps them per request because
+# middleware (CORS, GZip) mutates response headers in place.
+HEALTH_BODY = orjson.dumps({"status": "healthy", "service": "Portfolio AI Agent"})
+ROOT_BODY = orjson.dumps({
+    "message": "Portfolio AI Agent API",
+    "endpoints": {
+        "chat": "/api/chat",
+        "chat_stream": "/api/chat/stream",
+        "health": "/api/health"
+    }
+})
 
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "service": "Portfolio AI Agent"}
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 @app.get("/")
 async def root():
     """Root endpoint"""
-    return {
-        "message": "Portfolio AI Agent API",
-        "endpoints": {
-            "chat": "/api/chat",
-            "health": "/api/health"
-        }
-    }
+    return Response(content=ROOT_BODY, media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=3000)
+
+    # Default to one worker per core, but no more workers than DeepSeek slots
+    workers = int(os.getenv("WEB_CONCURRENCY", min(os.cpu_count() or 1, LLM_CONCURRENCY_TOTAL)))
+    # Worker processes inherit this and size their share of LLM_CONCURRENCY from it
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=3000,
+        workers=workers,
+        loop="uvloop",
+        http="httptools",
+        log_level="warning",
+    )